@@ -1,21 +1,29 @@
+import cProfile
 import datetime
 import os
 import io
+import re
+import time
 import numpy as np
 import threading
 
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from PIL import Image
 from dotenv import load_dotenv
 from pymongo import MongoClient
 from pymongo.errors import ConfigurationError, ServerSelectionTimeoutError, OperationFailure
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit
+
+from model_registry import ModelRegistry
+from state_backend import RESULT_CHANNEL, create_state
 # =========================
 # BASIC SETUP
 # =========================
 load_dotenv()
 app = Flask(__name__)
+# Caps the whole request body (all /classify/ images together); Flask answers 413 above it
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
  # Fix CORS for credentials: allow only frontend origin and set supports_credentials=True
 CORS(
     app,
@@ -34,7 +42,6 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 mongo_uri = os.getenv("MONGO_URI")
 
 db = None
-memory_waste_logs = []
 
 if mongo_uri:
     try:
@@ -53,41 +60,262 @@ else:
 # SYSTEM CONFIG
 # =========================
 CLASS_NAMES = ["hazardous", "recycle", "reject", "wet"]
+DEFAULT_DEVICE_ID = "BIN_01"   # device id written to waste logs
 
 # =========================
 # AI MODEL SETUP
 # =========================
 DUMMY_MODE = False
-MODEL_PATH = "C:/Users/sanja/runs/detect/runs/detect/waste_train_balanced2/weights/best.pt"
-model = None
+MODEL_PATH = os.getenv("MODEL_PATH", "C:/Users/sanja/runs/detect/runs/detect/waste_train_balanced2/weights/best.pt")
+# Poll MODEL_PATH every N seconds and hot-reload on change (0 = off)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+# Fraction of live traffic a reloaded candidate shadows before promotion (0 = swap immediately)
+MODEL_SHADOW_FRACTION = float(os.getenv("MODEL_SHADOW_FRACTION", "0"))
+if not 0.0 <= MODEL_SHADOW_FRACTION <= 1.0:
+    raise ValueError("MODEL_SHADOW_FRACTION must be between 0 and 1")
+_model_init_lock = threading.Lock()
+
+
+def _load_yolo(path):
+    from ultralytics import YOLO
+    return YOLO(path)
+
 
 def load_model():
-    """Load YOLOv8 model lazily on first prediction"""
-    global model, DUMMY_MODE
-    if model is None and not DUMMY_MODE:
-        try:
-            print("[AI] Loading YOLOv8 model...")
-            from ultralytics import YOLO
-            model = YOLO(MODEL_PATH)
-            print(f"[AI] Model loaded: {MODEL_PATH}")
-            print(f"[AI] Classes: {CLASS_NAMES}")
-            return model
-        except Exception as e:
-            print(f"[ERROR] Model load failed: {e}")
-            print("[MODE] Falling back to DUMMY mode")
-            DUMMY_MODE = True
-            return None
-    return model
+    """Load YOLOv8 model lazily on first prediction, then serve the registry's active model"""
+    global DUMMY_MODE
+    if registry.active is None and not DUMMY_MODE:
+        with _model_init_lock:
+            if registry.active is None and not DUMMY_MODE:
+                try:
+                    print("[AI] Loading YOLOv8 model...")
+                    registry.load(MODEL_PATH)
+                    print(f"[AI] Model loaded: {MODEL_PATH}")
+                    print(f"[AI] Classes: {CLASS_NAMES}")
+                except Exception as e:
+                    print(f"[ERROR] Model load failed: {e}")
+                    print("[MODE] Falling back to DUMMY mode")
+                    DUMMY_MODE = True
+                    return None
+
+    entry = registry.active
+    if entry is None:
+        return None
+    # A successful reload brings us back out of dummy mode
+    DUMMY_MODE = False
+    return entry.model
+
+# =========================
+# INFERENCE PIPELINE
+# =========================
+# Shared by /predict_waste (ESP32-CAM) and /classify/ (frontend / QA)
+MAX_CLASSIFY_BATCH = int(os.getenv("MAX_CLASSIFY_BATCH", "16"))
+
+
+def _decode_image(raw_bytes):
+    return Image.open(io.BytesIO(raw_bytes)).convert("RGB")
+
+
+def _classify_images(images, shadow=True):
+    """
+    Run one batched model call, returns (predicted_class, confidence, detected) per image
+    shadow=False keeps the call out of shadow sampling (QA uploads are not live traffic)
+    """
+    current_model = load_model()
+
+    if DUMMY_MODE or current_model is None:
+        # Dummy mode fallback
+        print("[DUMMY] Using dummy prediction")
+        return [("hazardous", 0.50, False) for _ in images]
+
+    # Real AI inference
+    start = time.perf_counter()
+    predictions = _run_model(current_model, images)
+    active_ms = (time.perf_counter() - start) * 1000
+
+    # Candidate (if any) runs on a sample of live traffic off the request path
+    if shadow:
+        registry.shadow(images, [p[0] for p in predictions], active_ms)
+    return predictions
+
+
+def _run_model(current_model, images, verbose=True):
+    results = current_model.predict(images, conf=0.25, verbose=False)
+
+    predictions = []
+    for result in results:
+        if len(result.boxes) > 0:
+            # Get highest confidence detection
+            boxes = result.boxes
+            confidences = boxes.conf.cpu().numpy()
+            classes = boxes.cls.cpu().numpy().astype(int)
+
+            # DEBUG: Print all detections
+            if verbose:
+                print(f"[DEBUG] All detections: {len(boxes)} objects")
+                for i, (cls, conf) in enumerate(zip(classes, confidences)):
+                    print(f"  [{i}] Class {cls} ({CLASS_NAMES[cls]}): {conf:.2%}")
+
+            # Get best prediction
+            best_idx = np.argmax(confidences)
+            predicted_class = CLASS_NAMES[classes[best_idx]]
+            confidence = float(confidences[best_idx])
+            if verbose:
+                print(f"[AI] Predicted: {predicted_class} (confidence: {confidence:.2%})")
+            predictions.append((predicted_class, confidence, True))
+        else:
+            # No detection
+            if verbose:
+                print("[AI] No waste detected, defaulting to reject")
+            predictions.append(("reject", 0.30, False))
+    return predictions
+
+
+def _map_bin(predicted_class):
+    """Return (bin_type, recyclable) for a predicted class"""
+    if predicted_class == "wet":
+        return "wet", False
+    elif predicted_class == "recycle":
+        return "recycle", True
+    elif predicted_class == "hazardous":
+        return "hazardous", False
+    else:
+        return "reject", False
+
+# =========================
+# MODEL REGISTRY
+# =========================
+def _warmup_model(candidate_model):
+    _run_model(candidate_model, [Image.new("RGB", (640, 640))], verbose=False)
+
+
+def _shadow_labels(candidate_model, images):
+    return [p[0] for p in _run_model(candidate_model, images, verbose=False)]
+
+
+registry = ModelRegistry(_load_yolo, _warmup_model, _shadow_labels, shadow_fraction=MODEL_SHADOW_FRACTION)
+
+if MODEL_WATCH_INTERVAL > 0:
+    registry.watch(MODEL_PATH, MODEL_WATCH_INTERVAL, shadow=MODEL_SHADOW_FRACTION > 0)
+    print(f"[AI] Watching {MODEL_PATH} every {MODEL_WATCH_INTERVAL:g}s")
 
 # =========================
 # SHARED STATE (IMPORTANT)
 # =========================
-latest_prediction = {
-    "waste_type": "reject",
-    "timestamp": None
-}
+# capture flag, latest prediction and memory-mode logs live in the state
+# backend. Use STATE_BACKEND=redis (+ REDIS_URL) when running several
+# workers or nodes so they all see the same state.
+state = create_state(os.getenv("STATE_BACKEND", "memory"), os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+
+
+def _emit_result(message):
+    ts = message.get("timestamp")
+    socketio.emit("waste_result", {
+        "waste_type": message.get("waste_type"),
+        "timestamp": ts.isoformat() if hasattr(ts, "isoformat") else ts
+    })
+
+
+# Results from any worker reach the dashboards connected to this one
+state.subscribe(RESULT_CHANNEL, _emit_result)
+
+# =========================
+# REQUEST PROFILING
+# =========================
+# Off unless PROFILING_ENABLED=1. When enabled, a request is profiled if it
+# sends "X-Profile: 1" / "?profile=1", or every PROFILE_SAMPLE_EVERY-th request
+# to a profiled route (0 disables sampling).
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILED_ROUTES = {"predict_waste", "dashboard_data", "classify_form"}
+
+_profile_counter = 0
+_profile_lock = threading.Lock()
+# cProfile is process-wide on Python 3.12+ (sys.monitoring) and sees every
+# thread, so only one request is profiled at a time; overlapping ones are skipped
+_profile_active = threading.Lock()
+
+
+def _should_profile():
+    """Decide whether the current request gets a profile"""
+    global _profile_counter
+    if request.endpoint not in PROFILED_ROUTES:
+        return False
+    if request.headers.get("X-Profile") == "1" or request.args.get("profile") == "1":
+        return True
+    if PROFILE_SAMPLE_EVERY > 0:
+        with _profile_lock:
+            _profile_counter += 1
+            return _profile_counter % PROFILE_SAMPLE_EVERY == 0
+    return False
+
+
+def _profile_device_id():
+    """Device tag for profile filenames; the ESP32-CAM sends none, so use the logged id"""
+    device_id = request.headers.get("X-Device-ID") or request.args.get("device_id") or DEFAULT_DEVICE_ID
+    return re.sub(r"[^A-Za-z0-9_-]", "_", device_id)[:32]
+
+
+def _rotate_profiles():
+    """Keep only the newest PROFILE_MAX_FILES profiles"""
+    files = sorted(
+        (os.path.join(PROFILE_DIR, f) for f in os.listdir(PROFILE_DIR) if f.endswith(".prof")),
+        key=os.path.getmtime
+    )
+    for old in files[:-PROFILE_MAX_FILES]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def _start_profile():
+    if not _should_profile() or not _profile_active.acquire(blocking=False):
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiling tool (debugger, coverage) already owns the hook
+        _profile_active.release()
+        print(f"[PROFILE] Skipped {request.endpoint}: {e}")
+        return
+    g.profiler = profiler
+    g.profile_start = time.perf_counter()
+
+
+def _finish_profile(exc):
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return
+    try:
+        profiler.disable()
+    finally:
+        _profile_active.release()
+    duration_ms = (time.perf_counter() - g.pop("profile_start")) * 1000
 
-capture_required = False   # 🔥 NEW FLAG
+    device_id = _profile_device_id()
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    filename = f"{timestamp}_{request.endpoint}_{device_id}_{duration_ms:.0f}ms.prof"
+
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+        _rotate_profiles()
+        print(f"[PROFILE] {request.endpoint} took {duration_ms:.1f} ms → {filename}")
+    except OSError as e:
+        print(f"[PROFILE] Failed to write profile: {e}")
+
+
+# Hooks are only registered when enabled so normal requests pay nothing
+if PROFILING_ENABLED:
+    if PROFILE_MAX_FILES < 1:
+        raise ValueError("PROFILE_MAX_FILES must be at least 1")
+    app.before_request(_start_profile)
+    app.teardown_request(_finish_profile)
+    print(f"[PROFILE] Enabled → {PROFILE_DIR} (sample 1-in-{PROFILE_SAMPLE_EVERY or '∞'})")
 
 # =========================
 # ROUTES
@@ -102,7 +330,8 @@ def health():
     return jsonify({
         "status": "ok",
         "db_connected": db is not None,
-        "dummy_mode": DUMMY_MODE
+        "dummy_mode": DUMMY_MODE,
+        "state_backend": state.name
     })
 
 
@@ -111,8 +340,7 @@ def health():
 # =====================================================
 @app.route("/waste_detected", methods=["POST"])
 def waste_detected():
-    global capture_required
-    capture_required = True
+    state.trigger_capture()
     print("[EVENT] Waste detected → capture_required = TRUE")
     return jsonify({"status": "ok"}), 200
 
@@ -122,9 +350,10 @@ def waste_detected():
 # =====================================================
 @app.route("/should_capture", methods=["GET"])
 def should_capture():
-    global capture_required
+    # Optional long-poll: ?wait=<seconds> holds the request until a trigger arrives
+    wait = min(request.args.get("wait", 0, type=float), 30.0)
 
-    if capture_required:
+    if state.capture_pending() or (wait > 0 and state.wait_for_capture(wait)):
         print("[SYNC] Camera capture allowed")
         return "YES", 200
     else:
@@ -136,83 +365,36 @@ def should_capture():
 # =====================================================
 @app.route("/predict_waste", methods=["POST"])
 def predict_waste():
-    global capture_required
-
     try:
         print("\n[INFO] /predict_waste called")
+        # Triggers after this point stay pending for the next capture
+        capture_token = state.capture_token()
 
         raw_bytes = request.get_data()
         if not raw_bytes:
             print("[ERROR] No image received")
             return jsonify({"error": "no image"}), 400
 
-        image = Image.open(io.BytesIO(raw_bytes)).convert("RGB")
+        image = _decode_image(raw_bytes)
         print("[OK] Image decoded:", image.size)
 
         # ---------- AI PREDICTION ----------
-        current_model = load_model()
-        
-        
-        if DUMMY_MODE or current_model is None:
-            # Dummy mode fallback
-            predicted_class = "hazardous"
-            confidence = 0.50
-            print("[DUMMY] Using dummy prediction")
-        else:
-            # Real AI inference
-            results = current_model.predict(image, conf=0.25, verbose=False)
-            
-            if len(results) > 0 and len(results[0].boxes) > 0:
-                # Get highest confidence detection
-                boxes = results[0].boxes
-                confidences = boxes.conf.cpu().numpy()
-                classes = boxes.cls.cpu().numpy().astype(int)
-                
-                # DEBUG: Print all detections
-                print(f"[DEBUG] All detections: {len(boxes)} objects")
-                for i, (cls, conf) in enumerate(zip(classes, confidences)):
-                    print(f"  [{i}] Class {cls} ({CLASS_NAMES[cls]}): {conf:.2%}")
-                
-                # Get best prediction
-                best_idx = np.argmax(confidences)
-                class_id = classes[best_idx]
-                confidence = float(confidences[best_idx])
-                predicted_class = CLASS_NAMES[class_id]
-                
-                print(f"[AI] Predicted: {predicted_class} (confidence: {confidence:.2%})")
-                
-                # Save debug image
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                debug_path = f"debug_images/{timestamp}_{predicted_class}.jpg"
-                os.makedirs("debug_images", exist_ok=True)
-                image.save(debug_path)
-                print(f"[DEBUG] Saved image to {debug_path}")
-            else:
-                # No detection
-                predicted_class = "reject"
-                confidence = 0.30
-                print("[AI] No waste detected, defaulting to reject")
+        predicted_class, confidence, detected = _classify_images([image])[0]
 
-        # ---------- BIN MAPPING ----------
-        if predicted_class == "wet":
-            bin_type = "wet"
-            recyclable = False
-        elif predicted_class == "recycle":
-            bin_type = "recycle"
-            recyclable = True
-        elif predicted_class == "hazardous":
-            bin_type = "hazardous"
-            recyclable = False
-        else:
-            bin_type = "reject"
-            recyclable = False
+        if detected:
+            # Save debug image
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            debug_path = f"debug_images/{timestamp}_{predicted_class}.jpg"
+            os.makedirs("debug_images", exist_ok=True)
+            image.save(debug_path)
+            print(f"[DEBUG] Saved image to {debug_path}")
 
-        # ---------- UPDATE CACHE ----------
-        latest_prediction["waste_type"] = predicted_class
-        latest_prediction["timestamp"] = datetime.datetime.now(datetime.timezone.utc)
+        # ---------- BIN MAPPING ----------
+        bin_type, recyclable = _map_bin(predicted_class)
 
-        # ---------- RESET CAPTURE FLAG ----------
-        capture_required = False
+        # ---------- UPDATE CACHE + RESET CAPTURE FLAG ----------
+        timestamp = datetime.datetime.now(datetime.timezone.utc)
+        state.record_result(predicted_class, timestamp, capture_token)
         print("[SYNC] capture_required reset to FALSE")
 
         # ---------- LOG DATA ----------
@@ -221,14 +403,14 @@ def predict_waste():
             "bin_type": bin_type,
             "recyclable": recyclable,
             "confidence": confidence,
-            "device_id": "BIN_01",
-            "timestamp": latest_prediction["timestamp"]
+            "device_id": DEFAULT_DEVICE_ID,
+            "timestamp": timestamp
         }  
 
         if db is not None:
             db.waste_logs.insert_one(waste_doc)
         else:
-            memory_waste_logs.append(waste_doc)
+            state.append_log(waste_doc)
 
         print("[SUCCESS] Prediction stored:", predicted_class)
         return jsonify({"status": "ok"}), 200
@@ -243,9 +425,7 @@ def predict_waste():
 # =====================================================
 @app.route("/get_waste_type", methods=["GET"])
 def get_waste_type():
-    wt = latest_prediction.get("waste_type", "reject")
-    latest_prediction["waste_type"] = "reject"
-    return wt, 200
+    return state.pop_waste_type(), 200
 
 
 # =====================================================
@@ -278,6 +458,8 @@ def _get_dashboard_data():
         except Exception:
             status_collection_name = None
 
+    memory_waste_logs = state.get_logs() if db is None else []
+
     for idx, (front_type, db_type) in enumerate(bin_db_map.items(), start=1):
         # Candidates for this bin type (synonyms)
         synonyms = {
@@ -382,7 +564,7 @@ def get_waste_logs():
         logs = list(db.waste_logs.find({}, {"_id": 0}))
         return jsonify(logs)
     else:
-        return jsonify(memory_waste_logs)
+        return jsonify(state.get_logs())
 
 # =====================================================
 # ALIASES & DUMMY ENDPOINTS FOR FRONTEND COMPATIBILITY
@@ -424,7 +606,7 @@ def get_classifications_alias():
                 log['created_at'] = ts.isoformat() if hasattr(ts, 'isoformat') else str(ts)
         return jsonify(logs)
     else:
-        logs = [log for log in memory_waste_logs if not waste_type or log.get('waste_type') == waste_type]
+        logs = [log for log in state.get_logs() if not waste_type or log.get('waste_type') == waste_type]
         return jsonify(logs)
 
 @app.route("/history/", methods=["GET"])
@@ -434,21 +616,113 @@ def get_history_placeholder():
 
 @app.route("/classify/", methods=["POST"])
 def classify_form():
-    # Handle multipart/form-data for frontend testing
-    if 'image' not in request.files:
+    # Multipart upload of one or more "image" / "images" files for frontend and QA
+    # testing. Runs the same pipeline as /predict_waste in a single batched model
+    # call, but never touches the device capture state or the waste logs.
+    files = request.files.getlist("image") + request.files.getlist("images")
+    if not files:
         return jsonify({"error": "no image"}), 400
-    
-    file = request.files['image']
-    image_bytes = file.read()
-    
-    # We can't easily call our own route, but we can call the prediction logic
-    # Injecting logic here would be redundant, so let's just use the shared predict_waste logic if possible
-    # For now, return a dummy or adapt predict_waste to handle both
-    return jsonify({
-        "waste_type": "recycle",
-        "confidence": 0.95,
-        "classification_id": 123
-    })
+    if len(files) > MAX_CLASSIFY_BATCH:
+        return jsonify({"error": f"too many images (max {MAX_CLASSIFY_BATCH})"}), 413
+
+    results = []
+    images = []
+    for idx, file in enumerate(files):
+        start = time.perf_counter()
+        entry = {"index": idx, "filename": file.filename}
+        try:
+            images.append((idx, _decode_image(file.read())))
+        except Exception as e:
+            entry["error"] = f"could not decode image: {e}"
+        entry["decode_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        results.append(entry)
+    if not images:
+        return jsonify({"error": "no image could be decoded", "results": results}), 400
+
+    start = time.perf_counter()
+    predictions = _classify_images([image for _, image in images], shadow=False)
+    inference_ms = (time.perf_counter() - start) * 1000
+
+    for (idx, _), (predicted_class, confidence, detected) in zip(images, predictions):
+        bin_type, recyclable = _map_bin(predicted_class)
+        results[idx].update({
+            "waste_type": predicted_class,
+            "bin_type": bin_type,
+            "recyclable": recyclable,
+            "confidence": confidence,
+            "detected": detected
+        })
+
+    response = {
+        "count": len(results),
+        "dummy_mode": DUMMY_MODE,
+        # One model call covers the whole batch, so only batch-level timings exist
+        "batch_inference_ms": round(inference_ms, 2),
+        "avg_inference_ms": round(inference_ms / len(images), 2),
+        "results": results
+    }
+    # Single-image callers (frontend classifyWaste) read the top-level fields
+    first = results[0]
+    if "waste_type" in first:
+        response.update({
+            "waste_type": first["waste_type"],
+            "confidence": first["confidence"]
+        })
+    return jsonify(response)
+
+# =========================
+# MODEL MANAGEMENT
+# =========================
+# The registry lives in each worker process: these endpoints only affect the
+# worker that handles the request. With several workers, copy the new weights
+# over MODEL_PATH and let every worker's MODEL_WATCH_INTERVAL watcher reload it.
+@app.route("/models", methods=["GET"])
+def model_status():
+    return jsonify({"dummy_mode": DUMMY_MODE, "pid": os.getpid(), **registry.status()})
+
+
+@app.route("/models/reload", methods=["POST"])
+def model_reload():
+    # Reloads MODEL_PATH only; loading a .pt unpickles it, so callers never pick the file.
+    # Body (optional): {"shadow": true, "shadow_fraction": 0.1}
+    data = request.get_json(silent=True) or {}
+
+    shadow_fraction = None
+    if "shadow_fraction" in data:
+        shadow_fraction = data["shadow_fraction"]
+        if isinstance(shadow_fraction, bool) or not isinstance(shadow_fraction, (int, float)):
+            return jsonify({"error": "shadow_fraction must be a number"}), 400
+        if not 0.0 <= shadow_fraction <= 1.0:
+            return jsonify({"error": "shadow_fraction must be between 0 and 1"}), 400
+        shadow_fraction = float(shadow_fraction)
+    fraction = registry.shadow_fraction if shadow_fraction is None else shadow_fraction
+
+    shadow = data.get("shadow", fraction > 0)
+    if not isinstance(shadow, bool):
+        return jsonify({"error": "shadow must be true or false"}), 400
+    if shadow and fraction == 0:
+        # A candidate that sees no traffic could never collect shadow stats
+        return jsonify({"error": "shadow needs a shadow_fraction above 0"}), 400
+
+    if not os.path.exists(MODEL_PATH):
+        return jsonify({"error": "model file not found"}), 404
+    if not registry.load_async(MODEL_PATH, shadow=shadow, shadow_fraction=shadow_fraction):
+        return jsonify({"error": "a model is already loading"}), 409
+    return jsonify({"status": "loading", "shadow": shadow}), 202
+
+
+@app.route("/models/promote", methods=["POST"])
+def model_promote():
+    if not registry.promote():
+        return jsonify({"error": "no candidate model"}), 404
+    return jsonify({"status": "ok", "active": registry.active.info()})
+
+
+@app.route("/models/discard", methods=["POST"])
+def model_discard():
+    if not registry.discard():
+        return jsonify({"error": "no candidate model"}), 404
+    return jsonify({"status": "ok"})
 
 # =========================
 # AUTH ENDPOINTS
@@ -195,10 +195,27 @@ export async function getCurrentUser(): Promise<CurrentUserResponse> {
 
 // ==================== ESP32 Classification API ====================
 
+export interface ClassifyResult {
+  index: number;
+  filename: string;
+  decode_ms: number;
+  waste_type?: string;
+  bin_type?: string;
+  recyclable?: boolean;
+  confidence?: number;
+  detected?: boolean;
+  error?: string;
+}
+
 export interface ClassifyResponse {
-  waste_type: string;
-  confidence: number;
-  classification_id: number;
+  // Taken from the first image; absent if it could not be decoded
+  waste_type?: string;
+  confidence?: number;
+  count: number;
+  dummy_mode: boolean;
+  batch_inference_ms: number;
+  avg_inference_ms: number;
+  results: ClassifyResult[];
 }
 
 /**
@@ -0,0 +1,263 @@
+"""
+Versioned model registry with background reload, atomic swap and shadow evaluation.
+
+The active model is a single attribute that is replaced in one assignment, so a
+request that already picked up the old model finishes on it while new requests
+get the new one. A candidate can instead be held in shadow mode, where it runs
+on a sampled fraction of live traffic off the request path and its agreement
+with the active model is recorded before promotion.
+"""
+import datetime
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelEntry:
+    """One loaded model version"""
+
+    def __init__(self, version, path, model, sha256, load_ms, warmup_ms):
+        self.version = version
+        self.path = path
+        self.model = model
+        self.sha256 = sha256
+        self.load_ms = load_ms
+        self.warmup_ms = warmup_ms
+        self.loaded_at = datetime.datetime.now(datetime.timezone.utc)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "path": self.path,
+            "sha256": self.sha256[:12],
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_ms": round(self.load_ms, 1),
+            "warmup_ms": round(self.warmup_ms, 1),
+        }
+
+
+class ShadowStats:
+    """Agreement and latency of the candidate against the active model"""
+
+    def __init__(self):
+        self.samples = 0
+        self.agreements = 0
+        self.active_ms = 0.0
+        self.candidate_ms = 0.0
+        self.errors = 0
+
+    def info(self):
+        n = self.samples
+        return {
+            "samples": n,
+            "agreement_rate": round(self.agreements / n, 4) if n else None,
+            "active_avg_ms": round(self.active_ms / n, 2) if n else None,
+            "candidate_avg_ms": round(self.candidate_ms / n, 2) if n else None,
+            "errors": self.errors,
+        }
+
+
+class ModelRegistry:
+    """
+    load_fn(path) -> model, warmup_fn(model) runs a dummy inference and
+    predict_fn(model, images) -> list of labels is used for shadow comparison.
+    """
+
+    def __init__(self, load_fn, warmup_fn, predict_fn, shadow_fraction=0.0, max_history=5):
+        self.load_fn = load_fn
+        self.warmup_fn = warmup_fn
+        self.predict_fn = predict_fn
+        self.shadow_fraction = shadow_fraction
+        self.max_history = max_history
+
+        self.active = None
+        self.candidate = None
+        self.shadow_stats = ShadowStats()
+        self.history = []
+        self.loading = None
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._next_version = 1
+        self._shadow_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._shadow_busy = threading.Semaphore(1)
+        self._watcher = None
+
+    # ---------- LOADING ----------
+    def _build_entry(self, path):
+        # Hash before loading: if the file is replaced mid-load the recorded hash
+        # is the older one, so the watcher still sees the newer file as changed
+        sha256 = _file_sha256(path)
+
+        start = time.perf_counter()
+        model = self.load_fn(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        self.warmup_fn(model)
+        warmup_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            version = self._next_version
+            self._next_version += 1
+        return ModelEntry(version, path, model, sha256, load_ms, warmup_ms)
+
+    def _install(self, entry, shadow, shadow_fraction=None):
+        with self._lock:
+            if shadow and self.active is not None:
+                self.candidate = entry
+                self.shadow_stats = ShadowStats()
+                if shadow_fraction is not None:
+                    self.shadow_fraction = shadow_fraction
+                print(f"[MODEL] v{entry.version} loaded as shadow candidate ({self.shadow_fraction:.0%} of traffic)")
+                return
+            self._swap(entry)
+
+    def _swap(self, entry):
+        # Single assignment: requests holding the old model keep using it
+        previous, self.active = self.active, entry
+        if previous is not None:
+            self.history.append(previous.info())
+            self.history = self.history[-self.max_history:]
+        print(f"[MODEL] v{entry.version} active: {entry.path}")
+
+    def load(self, path, shadow=False, shadow_fraction=None):
+        """Load, warm up and install a model synchronously; returns the entry"""
+        entry = self._build_entry(path)
+        self._install(entry, shadow, shadow_fraction)
+        return entry
+
+    def load_async(self, path, shadow=False, shadow_fraction=None):
+        """Load in a background thread; returns False if a load is already running"""
+        with self._lock:
+            if self.loading is not None:
+                return False
+            self.loading = path
+
+        def run():
+            try:
+                self.load(path, shadow, shadow_fraction)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{path}: {e}"
+                print(f"[MODEL] Reload failed, keeping current model: {e}")
+            finally:
+                with self._lock:
+                    self.loading = None
+
+        threading.Thread(target=run, name="model-reload", daemon=True).start()
+        return True
+
+    def promote(self):
+        """Make the shadow candidate the active model"""
+        with self._lock:
+            if self.candidate is None:
+                return False
+            entry, self.candidate = self.candidate, None
+            self._swap(entry)
+            return True
+
+    def discard(self):
+        with self._lock:
+            discarded, self.candidate = self.candidate, None
+            return discarded is not None
+
+    # ---------- SHADOW MODE ----------
+    def shadow(self, images, active_labels, active_ms):
+        """Maybe run the candidate on the same images in the background"""
+        candidate = self.candidate
+        if candidate is None or random.random() >= self.shadow_fraction:
+            return
+        # Drop the sample rather than queue behind a running one
+        if not self._shadow_busy.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                start = time.perf_counter()
+                labels = self.predict_fn(candidate.model, images)
+                candidate_ms = (time.perf_counter() - start) * 1000
+                with self._lock:
+                    if self.candidate is not candidate:
+                        return
+                    stats = self.shadow_stats
+                    stats.samples += len(images)
+                    stats.agreements += sum(a == b for a, b in zip(active_labels, labels))
+                    stats.active_ms += active_ms
+                    stats.candidate_ms += candidate_ms
+            except Exception as e:
+                with self._lock:
+                    self.shadow_stats.errors += 1
+                print(f"[MODEL] Shadow inference failed: {e}")
+            finally:
+                self._shadow_busy.release()
+
+        self._shadow_pool.submit(run)
+
+    # ---------- FILE WATCHER ----------
+    def is_loaded(self, sha256):
+        """True if the active model or the candidate was built from this file hash"""
+        with self._lock:
+            return any(e is not None and e.sha256 == sha256 for e in (self.active, self.candidate))
+
+    def _check_file(self, path, last, interval, shadow):
+        """One watcher poll; returns the mtime that has been handled"""
+        mtime = os.path.getmtime(path)
+        if mtime == last:
+            return last
+        # Wait for the copy to finish before loading
+        time.sleep(interval)
+        if os.path.getmtime(path) != mtime:
+            return last
+        if self.is_loaded(_file_sha256(path)):
+            return mtime
+        print(f"[MODEL] Change detected in {path}")
+        # Busy with another load: leave last alone so the next poll retries
+        return mtime if self.load_async(path, shadow) else last
+
+    def watch(self, path, interval, shadow=False):
+        """Poll path and reload when its contents change"""
+        # The file present now is loaded lazily by the app, not by the watcher
+        try:
+            initial = os.path.getmtime(path)
+        except OSError:
+            initial = None
+
+        def run():
+            last = initial
+            while True:
+                try:
+                    last = self._check_file(path, last, interval, shadow)
+                except OSError:
+                    # Missing or mid-copy; try again on the next poll
+                    pass
+                except Exception as e:
+                    print(f"[MODEL] Watcher error: {e}")
+                time.sleep(interval)
+
+        self._watcher = threading.Thread(target=run, name="model-watcher", daemon=True)
+        self._watcher.start()
+
+    # ---------- STATUS ----------
+    def status(self):
+        with self._lock:
+            return {
+                "active": self.active.info() if self.active else None,
+                "candidate": self.candidate.info() if self.candidate else None,
+                "shadow_fraction": self.shadow_fraction,
+                "shadow_stats": self.shadow_stats.info() if self.candidate else None,
+                "loading": self.loading,
+                "last_error": self.last_error,
+                "history": list(self.history),
+            }
@@ -0,0 +1,250 @@
+"""
+Coordination state shared between the ESP32 routes
+(capture flag, latest prediction, in-memory waste logs).
+
+InProcessState keeps everything in this process, like the old module globals.
+RedisState keeps it in Redis so several workers / nodes see the same state.
+"""
+import datetime
+import json
+import threading
+import time
+
+DEFAULT_WASTE_TYPE = "reject"
+
+CAPTURE_CHANNEL = "capture"
+RESULT_CHANNEL = "result"
+
+
+def _encode(doc):
+    def default(value):
+        if isinstance(value, datetime.datetime):
+            return {"$dt": value.isoformat()}
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+    return json.dumps(doc, default=default)
+
+
+def _decode(raw):
+    def hook(obj):
+        if set(obj) == {"$dt"}:
+            return datetime.datetime.fromisoformat(obj["$dt"])
+        return obj
+    return json.loads(raw, object_hook=hook)
+
+
+class StateBackend:
+    """Interface every state backend implements"""
+
+    name = "base"
+
+    def trigger_capture(self):
+        """Ask the camera to capture and notify CAPTURE_CHANNEL subscribers"""
+        raise NotImplementedError
+
+    def capture_pending(self):
+        raise NotImplementedError
+
+    def capture_token(self):
+        """Current trigger count; pass it to record_result to acknowledge those triggers"""
+        raise NotImplementedError
+
+    def wait_for_capture(self, timeout):
+        """Block up to timeout seconds for a capture trigger; return whether one is pending"""
+        raise NotImplementedError
+
+    def record_result(self, waste_type, timestamp, token):
+        """
+        Atomically store the latest result and acknowledge triggers up to token,
+        then notify RESULT_CHANNEL subscribers. Triggers that arrived after the
+        token was taken stay pending.
+        """
+        raise NotImplementedError
+
+    def pop_waste_type(self):
+        """Atomically return the latest waste type and reset it to the default"""
+        raise NotImplementedError
+
+    def append_log(self, doc):
+        raise NotImplementedError
+
+    def get_logs(self):
+        raise NotImplementedError
+
+    def subscribe(self, channel, callback):
+        """Call callback(message_dict) for every message published on channel"""
+        raise NotImplementedError
+
+    def close(self):
+        """Stop background subscribers"""
+
+
+class InProcessState(StateBackend):
+    """Single-process state guarded by a lock (one worker only)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._ack = 0
+        self._waste_type = DEFAULT_WASTE_TYPE
+        self._logs = []
+        self._subscribers = {}
+
+    def _publish(self, channel, message):
+        for callback in list(self._subscribers.get(channel, [])):
+            try:
+                callback(message)
+            except Exception as e:
+                print(f"[STATE] Subscriber on '{channel}' failed: {e}")
+
+    def trigger_capture(self):
+        with self._cond:
+            self._seq += 1
+            self._cond.notify_all()
+        self._publish(CAPTURE_CHANNEL, {"capture": True})
+
+    def capture_pending(self):
+        with self._cond:
+            return self._seq > self._ack
+
+    def capture_token(self):
+        with self._cond:
+            return self._seq
+
+    def wait_for_capture(self, timeout):
+        with self._cond:
+            return self._cond.wait_for(lambda: self._seq > self._ack, timeout)
+
+    def record_result(self, waste_type, timestamp, token):
+        with self._cond:
+            self._waste_type = waste_type
+            self._ack = max(self._ack, token)
+        self._publish(RESULT_CHANNEL, {"waste_type": waste_type, "timestamp": timestamp})
+
+    def pop_waste_type(self):
+        with self._cond:
+            waste_type, self._waste_type = self._waste_type, DEFAULT_WASTE_TYPE
+            return waste_type
+
+    def append_log(self, doc):
+        with self._cond:
+            self._logs.append(doc)
+
+    def get_logs(self):
+        with self._cond:
+            return list(self._logs)
+
+    def subscribe(self, channel, callback):
+        self._subscribers.setdefault(channel, []).append(callback)
+
+
+class RedisState(StateBackend):
+    """
+    State stored in Redis (or anything speaking its protocol).
+    Pass client= to use an existing redis-py compatible client.
+    """
+
+    name = "redis"
+
+    def __init__(self, url=None, client=None, prefix="smartws:"):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._listeners = []
+
+    def _key(self, name):
+        return self.prefix + name
+
+    def _publish(self, channel, message):
+        self.client.publish(self._key(channel), _encode(message))
+
+    def trigger_capture(self):
+        self.client.incr(self._key("capture_seq"))
+        self._publish(CAPTURE_CHANNEL, {"capture": True})
+
+    def capture_pending(self):
+        seq, ack = self.client.mget(self._key("capture_seq"), self._key("capture_ack"))
+        return int(seq or 0) > int(ack or 0)
+
+    def capture_token(self):
+        return int(self.client.get(self._key("capture_seq")) or 0)
+
+    def wait_for_capture(self, timeout):
+        # Subscribe before checking so a trigger in between is not missed
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(self._key(CAPTURE_CHANNEL))
+            deadline = time.monotonic() + timeout
+            while not self.capture_pending():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # Returns None early for subscribe confirmations, so loop
+                pubsub.get_message(timeout=remaining)
+            return True
+        finally:
+            pubsub.close()
+
+    def record_result(self, waste_type, timestamp, token):
+        # WATCH/MULTI so concurrent acks never move capture_ack backwards
+        ack_key = self._key("capture_ack")
+
+        def txn(pipe):
+            ack = int(pipe.get(ack_key) or 0)
+            pipe.multi()
+            pipe.set(self._key("waste_type"), waste_type)
+            if token > ack:
+                pipe.set(ack_key, token)
+
+        self.client.transaction(txn, ack_key)
+        self._publish(RESULT_CHANNEL, {"waste_type": waste_type, "timestamp": timestamp})
+
+    def pop_waste_type(self):
+        value = self.client.set(self._key("waste_type"), DEFAULT_WASTE_TYPE, get=True)
+        if value is None:
+            return DEFAULT_WASTE_TYPE
+        return value.decode() if isinstance(value, bytes) else value
+
+    def append_log(self, doc):
+        self.client.rpush(self._key("waste_logs"), _encode(doc))
+
+    def get_logs(self):
+        return [_decode(raw) for raw in self.client.lrange(self._key("waste_logs"), 0, -1)]
+
+    def subscribe(self, channel, callback):
+        def handler(message):
+            try:
+                callback(_decode(message["data"]))
+            except Exception as e:
+                print(f"[STATE] Subscriber on '{channel}' failed: {e}")
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self._key(channel): handler})
+        self._listeners.append(pubsub.run_in_thread(sleep_time=0.1, daemon=True))
+
+    def close(self):
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners = []
+
+
+def create_state(backend="memory", redis_url=None):
+    """
+    Build the configured backend. Redis failures are fatal: silently falling
+    back to in-process state would split state between workers.
+    """
+    if backend == "memory":
+        print("[STATE] Using in-process state backend")
+        return InProcessState()
+    if backend == "redis":
+        try:
+            state = RedisState(redis_url)
+            state.client.ping()
+        except Exception as e:
+            raise RuntimeError(f"STATE_BACKEND=redis but Redis is unavailable at {redis_url}: {e}") from e
+        print(f"[STATE] Using Redis state backend: {redis_url}")
+        return state
+    raise ValueError(f"Unknown STATE_BACKEND '{backend}' (expected 'memory' or 'redis')")
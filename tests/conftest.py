@@ -0,0 +1,19 @@
+import os
+import sys
+import time
+
+import pytest
+
+# Backend modules live at the repo root next to app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def wait_until():
+    """Poll predicate until it is truthy or timeout seconds pass; returns its last value"""
+    def wait(predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return predicate()
+    return wait
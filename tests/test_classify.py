@@ -0,0 +1,80 @@
+import io
+
+import pytest
+from PIL import Image
+
+import app as backend
+from state_backend import DEFAULT_WASTE_TYPE, InProcessState
+
+
+def _jpeg():
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8), "green").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # No weights file: the first request falls back to dummy predictions
+    monkeypatch.setattr(backend, "MODEL_PATH", str(tmp_path / "missing.pt"))
+    monkeypatch.setattr(backend, "DUMMY_MODE", False)
+    monkeypatch.setattr(backend, "state", InProcessState())
+    monkeypatch.setattr(backend, "db", None)
+    return backend.app.test_client()
+
+
+def _post(client, *files):
+    data = {"images": [(io.BytesIO(content), name) for name, content in files]}
+    return client.post("/classify/", data=data, content_type="multipart/form-data")
+
+
+def test_classify_batch_maps_failed_decodes_by_index(client):
+    response = _post(client, ("a.jpg", _jpeg()), ("broken.jpg", b"not an image"), ("c.jpg", _jpeg()))
+    assert response.status_code == 200
+
+    body = response.get_json()
+    assert body["dummy_mode"] is True
+    assert body["count"] == 3
+    assert [r["index"] for r in body["results"]] == [0, 1, 2]
+    assert [r["filename"] for r in body["results"]] == ["a.jpg", "broken.jpg", "c.jpg"]
+
+    ok_a, broken, ok_c = body["results"]
+    assert "error" in broken and "waste_type" not in broken
+    assert ok_a["waste_type"] == ok_c["waste_type"] == "hazardous"
+    assert "error" not in ok_a and "error" not in ok_c
+    assert body["waste_type"] == "hazardous"
+
+
+def test_classify_rejects_batch_over_limit(client, monkeypatch):
+    monkeypatch.setattr(backend, "MAX_CLASSIFY_BATCH", 2)
+    response = _post(client, *[(f"{n}.jpg", _jpeg()) for n in range(3)])
+    assert response.status_code == 413
+
+
+def test_classify_fails_when_no_image_decodes(client):
+    response = _post(client, ("a.jpg", b"junk"), ("b.jpg", b"more junk"))
+    assert response.status_code == 400
+    assert all("error" in r for r in response.get_json()["results"])
+
+
+def test_classify_leaves_capture_state_and_logs_alone(client):
+    backend.state.trigger_capture()
+    token = backend.state.capture_token()
+
+    assert _post(client, ("a.jpg", _jpeg())).status_code == 200
+
+    assert backend.state.capture_pending()
+    assert backend.state.capture_token() == token
+    assert backend.state.get_logs() == []
+    assert backend.state.pop_waste_type() == DEFAULT_WASTE_TYPE
+
+
+def test_classify_is_not_shadow_sampled(client, monkeypatch):
+    shadowed = []
+    monkeypatch.setattr(backend, "load_model", lambda: object())
+    monkeypatch.setattr(backend, "_run_model", lambda model, images: [("wet", 0.9, True)] * len(images))
+    monkeypatch.setattr(backend.registry, "shadow", lambda *args: shadowed.append(args))
+
+    response = _post(client, ("a.jpg", _jpeg()))
+    assert response.get_json()["waste_type"] == "wet"
+    assert shadowed == []
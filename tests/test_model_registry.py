@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+
+import pytest
+
+from model_registry import ModelRegistry, _file_sha256
+
+INTERVAL = 0.05
+
+
+def _write(path, content, mtime):
+    with open(path, "w") as f:
+        f.write(content)
+    os.utime(path, (mtime, mtime))
+
+
+def _read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def _registry(load_fn=_read, shadow_fraction=0.0):
+    # A "model" is the file's text; predicting labels every image with it
+    return ModelRegistry(load_fn, lambda m: None, lambda m, images: [m] * len(images),
+                         shadow_fraction=shadow_fraction)
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    path = str(tmp_path / "best.pt")
+    _write(path, "v1", 1000)
+    return path
+
+
+def test_load_swaps_and_keeps_history(model_path):
+    registry = _registry()
+    first = registry.load(model_path)
+    in_flight = registry.active.model
+
+    _write(model_path, "v2", 2000)
+    registry.load(model_path)
+
+    assert registry.active.model == "v2"
+    assert registry.active.version == first.version + 1
+    assert in_flight == "v1"
+    assert [h["version"] for h in registry.status()["history"]] == [first.version]
+
+
+def test_shadow_candidate_promote_and_discard(model_path):
+    registry = _registry()
+    registry.load(model_path)
+
+    _write(model_path, "v2", 2000)
+    registry.load(model_path, shadow=True, shadow_fraction=0.5)
+    assert registry.active.model == "v1"
+    assert registry.candidate.model == "v2"
+    assert registry.shadow_fraction == 0.5
+
+    assert registry.promote()
+    assert registry.active.model == "v2"
+    assert registry.candidate is None
+    assert not registry.promote()
+
+    _write(model_path, "v3", 3000)
+    registry.load(model_path, shadow=True)
+    assert registry.discard()
+    assert registry.active.model == "v2"
+    assert not registry.discard()
+
+
+def test_shadow_first_load_becomes_active(model_path):
+    registry = _registry()
+    registry.load(model_path, shadow=True)
+    assert registry.active.model == "v1"
+    assert registry.candidate is None
+
+
+def test_shadow_stats(model_path, wait_until):
+    registry = _registry(shadow_fraction=1.0)
+    registry.load(model_path)
+    _write(model_path, "v2", 2000)
+    registry.load(model_path, shadow=True)
+
+    registry.shadow(["img_a", "img_b"], ["v2", "v1"], 10.0)
+    assert wait_until(lambda: registry.status()["shadow_stats"]["samples"] == 2)
+
+    stats = registry.status()["shadow_stats"]
+    assert stats["agreement_rate"] == 0.5
+    assert stats["active_avg_ms"] == 5.0
+    assert stats["errors"] == 0
+
+
+def test_shadow_skipped_without_candidate_or_sampling(model_path):
+    registry = _registry(shadow_fraction=0.0)
+    registry.load(model_path)
+    _write(model_path, "v2", 2000)
+    registry.load(model_path, shadow=True)
+
+    registry.shadow(["img"], ["v1"], 1.0)
+    registry._shadow_pool.shutdown(wait=True)
+    assert registry.status()["shadow_stats"]["samples"] == 0
+
+
+def test_load_async_rejects_concurrent_load(model_path, wait_until):
+    release = threading.Event()
+
+    def slow_load(path):
+        release.wait(5)
+        return _read(path)
+
+    registry = _registry(slow_load)
+    assert registry.load_async(model_path)
+    assert not registry.load_async(model_path)
+    release.set()
+    assert wait_until(lambda: registry.active is not None and registry.loading is None)
+
+
+def test_hash_is_taken_before_load(model_path):
+    original = _file_sha256(model_path)
+
+    def load_then_replace(path):
+        content = _read(path)
+        _write(path, "v2", 2000)
+        return content
+
+    entry = _registry(load_then_replace).load(model_path)
+    assert entry.model == "v1"
+    assert entry.sha256 == original
+
+
+def test_failed_load_keeps_current_model(model_path, wait_until):
+    def load(path):
+        content = _read(path)
+        if content == "broken":
+            raise RuntimeError("bad weights")
+        return content
+
+    registry = _registry(load)
+    registry.load(model_path)
+    _write(model_path, "broken", 2000)
+    assert registry.load_async(model_path)
+    assert wait_until(lambda: registry.last_error is not None)
+    assert registry.active.model == "v1"
+
+
+def test_watcher_reloads_on_change(model_path, wait_until):
+    registry = _registry()
+    registry.load(model_path)
+    registry.watch(model_path, INTERVAL)
+
+    _write(model_path, "v2", 2000)
+    assert wait_until(lambda: registry.active.model == "v2")
+
+
+def test_watcher_picks_up_change_made_during_a_load(model_path, wait_until):
+    loading_v2 = threading.Event()
+    release = threading.Event()
+
+    def load(path):
+        content = _read(path)
+        if content == "v2":
+            loading_v2.set()
+            release.wait(5)
+        return content
+
+    registry = _registry(load)
+    registry.load(model_path)
+    registry.watch(model_path, INTERVAL)
+
+    _write(model_path, "v2", 2000)
+    assert loading_v2.wait(5)
+    _write(model_path, "v3", 3000)
+    time.sleep(INTERVAL * 6)  # watcher sees v3 while v2 is still loading
+    release.set()
+
+    assert wait_until(lambda: registry.active.model == "v3")
+    assert registry.active.sha256 == _file_sha256(model_path)
+
+
+def test_watcher_survives_missing_file(model_path, wait_until):
+    registry = _registry()
+    registry.load(model_path)
+    registry.watch(model_path, INTERVAL)
+
+    os.remove(model_path)
+    time.sleep(INTERVAL * 6)
+    assert registry._watcher.is_alive()
+
+    _write(model_path, "v2", 2000)
+    assert wait_until(lambda: registry.active.model == "v2")
+
+
+def test_watcher_survives_file_vanishing_mid_check(model_path, monkeypatch, wait_until):
+    registry = _registry()
+    registry.load(model_path)
+    check_file = registry._check_file
+    calls = []
+
+    def vanish_once(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise FileNotFoundError(model_path)
+        return check_file(*args)
+
+    monkeypatch.setattr(registry, "_check_file", vanish_once)
+    registry.watch(model_path, INTERVAL)
+
+    _write(model_path, "v2", 2000)
+    assert wait_until(lambda: registry.active.model == "v2")
+    assert registry._watcher.is_alive()
+
+
+def test_watcher_ignores_touch_without_content_change(model_path):
+    registry = _registry()
+    first = registry.load(model_path)
+    registry.watch(model_path, INTERVAL)
+
+    os.utime(model_path, (2000, 2000))
+    time.sleep(INTERVAL * 6)
+    assert registry.active is first
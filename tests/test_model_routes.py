@@ -0,0 +1,47 @@
+import pytest
+
+import app as backend
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    model_path = tmp_path / "best.pt"
+    model_path.write_bytes(b"weights")
+    monkeypatch.setattr(backend, "MODEL_PATH", str(model_path))
+    monkeypatch.setattr(backend.registry, "shadow_fraction", 0.0)
+    loads = []
+    monkeypatch.setattr(backend.registry, "load_async", lambda *args, **kwargs: loads.append(kwargs) or True)
+    test_client = backend.app.test_client()
+    test_client.loads = loads
+    return test_client
+
+
+@pytest.mark.parametrize("body", [
+    {"shadow": "false"},
+    {"shadow": 1},
+    {"shadow_fraction": "0.1"},
+    {"shadow_fraction": True},
+    {"shadow_fraction": 1.5},
+])
+def test_reload_rejects_invalid_options(client, body):
+    assert client.post("/models/reload", json=body).status_code == 400
+    assert client.loads == []
+
+
+def test_reload_rejects_shadow_without_traffic(client):
+    assert client.post("/models/reload", json={"shadow": True}).status_code == 400
+    assert client.post("/models/reload", json={"shadow": True, "shadow_fraction": 0}).status_code == 400
+    assert client.loads == []
+
+
+def test_reload_shadow_with_fraction(client):
+    response = client.post("/models/reload", json={"shadow": True, "shadow_fraction": 0.1})
+    assert response.status_code == 202
+    assert client.loads == [{"shadow": True, "shadow_fraction": 0.1}]
+
+
+def test_reload_defaults_to_immediate_swap(client):
+    response = client.post("/models/reload")
+    assert response.status_code == 202
+    assert response.get_json()["shadow"] is False
+    assert client.loads == [{"shadow": False, "shadow_fraction": None}]
@@ -0,0 +1,128 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from state_backend import (
+    CAPTURE_CHANNEL,
+    DEFAULT_WASTE_TYPE,
+    RESULT_CHANNEL,
+    InProcessState,
+    RedisState,
+    create_state,
+)
+
+NOW = datetime.datetime(2026, 2, 5, 21, 57, 44, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def redis_server():
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeServer()
+
+
+def _redis_state(server):
+    import fakeredis
+    return RedisState(client=fakeredis.FakeRedis(server=server))
+
+
+@pytest.fixture(params=["memory", "redis"])
+def state(request):
+    if request.param == "memory":
+        backend = InProcessState()
+    else:
+        backend = _redis_state(request.getfixturevalue("redis_server"))
+    yield backend
+    backend.close()
+
+
+def test_trigger_pending_acknowledge(state):
+    assert not state.capture_pending()
+    state.trigger_capture()
+    assert state.capture_pending()
+    state.record_result("wet", NOW, state.capture_token())
+    assert not state.capture_pending()
+
+
+def test_record_result_keeps_later_triggers_pending(state):
+    state.trigger_capture()
+    token = state.capture_token()
+    state.trigger_capture()  # arrives while the first capture is being classified
+
+    state.record_result("wet", NOW, token)
+    assert state.capture_pending()
+
+    state.record_result("wet", NOW, state.capture_token())
+    assert not state.capture_pending()
+
+
+def test_stale_token_does_not_undo_newer_ack(state):
+    state.trigger_capture()
+    old = state.capture_token()
+    state.trigger_capture()
+    state.record_result("wet", NOW, state.capture_token())
+    state.record_result("recycle", NOW, old)
+    assert not state.capture_pending()
+
+
+def test_pop_waste_type_resets(state):
+    assert state.pop_waste_type() == DEFAULT_WASTE_TYPE
+    state.record_result("hazardous", NOW, state.capture_token())
+    assert state.pop_waste_type() == "hazardous"
+    assert state.pop_waste_type() == DEFAULT_WASTE_TYPE
+
+
+def test_log_round_trip_keeps_datetimes(state):
+    doc = {"waste_type": "wet", "bin_type": "wet", "confidence": 0.9, "timestamp": NOW}
+    state.append_log(doc)
+    logs = state.get_logs()
+    assert logs == [doc]
+    assert isinstance(logs[0]["timestamp"], datetime.datetime)
+
+
+def test_pubsub_delivers_triggers_and_results(state, wait_until):
+    captures, results = [], []
+    state.subscribe(CAPTURE_CHANNEL, captures.append)
+    state.subscribe(RESULT_CHANNEL, results.append)
+    time.sleep(0.2)  # let Redis listener threads subscribe
+
+    state.trigger_capture()
+    state.record_result("recycle", NOW, state.capture_token())
+
+    assert wait_until(lambda: captures and results)
+    assert captures == [{"capture": True}]
+    assert results == [{"waste_type": "recycle", "timestamp": NOW}]
+
+
+def test_wait_for_capture_times_out(state):
+    start = time.monotonic()
+    assert state.wait_for_capture(0.2) is False
+    assert time.monotonic() - start >= 0.15
+
+
+def test_wait_for_capture_wakes_on_trigger(state):
+    threading.Timer(0.1, state.trigger_capture).start()
+    start = time.monotonic()
+    assert state.wait_for_capture(5) is True
+    assert time.monotonic() - start < 2
+
+
+def test_redis_state_is_shared_between_workers(redis_server):
+    worker_a, worker_b = _redis_state(redis_server), _redis_state(redis_server)
+    worker_a.trigger_capture()
+    assert worker_b.capture_pending()
+    worker_b.record_result("wet", NOW, worker_b.capture_token())
+    assert not worker_a.capture_pending()
+    assert worker_a.pop_waste_type() == "wet"
+
+
+def test_create_state_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        create_state("mongo")
+
+
+def test_create_state_fails_when_redis_unreachable():
+    pytest.importorskip("redis")
+    with pytest.raises(RuntimeError):
+        create_state("redis", "redis://127.0.0.1:1/0")
@@ -0,0 +1,224 @@
+"""
+Memory-mapped dataset cache for YOLOv8 training
+Images are decoded and resized once by prepare_cache.py; training then reads
+pixels straight from the mapped array instead of decoding JPEGs every epoch
+"""
+import os
+
+import cv2
+import numpy as np
+from ultralytics.data import YOLODataset
+from ultralytics.data.utils import IMG_FORMATS, img2label_paths
+from ultralytics.models.yolo.detect import DetectionTrainer
+from ultralytics.utils import colorstr
+
+
+def cache_paths(cache_dir, split, imgsz):
+    """Return (images .npy, metadata .npz) paths for one split"""
+    base = os.path.join(cache_dir, f"{split}_{imgsz}")
+    return base + ".npy", base + ".npz"
+
+
+def cache_key(path):
+    """Normalized image path used to look up cache slots"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def list_images(img_dir):
+    """Same image discovery rule as ultralytics (recursive, by extension)"""
+    files = []
+    for root, _, names in os.walk(img_dir):
+        for name in names:
+            if name.rpartition(".")[-1].lower() in IMG_FORMATS:
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+
+def dataset_fingerprint(files):
+    """Image keys plus image/label mtimes, stored with the cache to detect changes"""
+    label_files = img2label_paths(files)
+    return {
+        "files": np.array([cache_key(f) for f in files]),
+        "image_mtimes": np.array([os.path.getmtime(f) for f in files], dtype=np.float64),
+        "label_mtimes": np.array([os.path.getmtime(f) if os.path.exists(f) else -1.0
+                                  for f in label_files], dtype=np.float64),
+    }
+
+
+def cache_is_current(img_dir, images_path, meta_path):
+    """True if the cache exists and matches the images and labels on disk"""
+    if not (os.path.exists(images_path) and os.path.exists(meta_path)):
+        return False
+    current = dataset_fingerprint(list_images(img_dir))
+    with np.load(meta_path, allow_pickle=False) as meta:
+        # Caches from before label checking have no "valid" array
+        if not all(k in meta.files for k in (*current, "valid")):
+            return False
+        return all(np.array_equal(meta[k], v) for k, v in current.items())
+
+
+def read_label(label_path, nc):
+    """
+    Read and check a YOLO label file, the same way ultralytics' verify_image_label does
+    Returns (cls (n,1), bboxes (n,4) normalized xywh, warning or "") and raises
+    ValueError for a corrupt file; a missing or empty file is a background image
+    """
+    rows = []
+    if os.path.isfile(label_path):
+        with open(label_path) as f:
+            lines = [line.split() for line in f.read().strip().splitlines() if line.strip()]
+        for n, parts in enumerate(lines, start=1):
+            if len(parts) < 5 or len(parts) % 2 == 0:
+                raise ValueError(f"line {n} has {len(parts)} fields, expected 5 or an odd number for a polygon")
+            try:
+                values = [float(x) for x in parts]
+            except ValueError:
+                raise ValueError(f"line {n} is not numeric") from None
+            if len(values) > 5:
+                # Polygon label → enclosing box
+                xs, ys = values[1::2], values[2::2]
+                x0, x1, y0, y1 = min(xs), max(xs), min(ys), max(ys)
+                values = [values[0], (x0 + x1) / 2, (y0 + y1) / 2, x1 - x0, y1 - y0]
+            rows.append(values)
+
+    labels = np.array(rows, dtype=np.float32).reshape(-1, 5)
+    msg = ""
+    if len(labels):
+        if labels.min() < 0:
+            raise ValueError(f"negative label values {labels[labels < 0]}")
+        if labels[:, 1:].max() > 1:
+            raise ValueError(f"non-normalized or out of bounds coordinates {labels[:, 1:][labels[:, 1:] > 1]}")
+        max_cls = int(labels[:, 0].max())
+        if max_cls >= nc:
+            raise ValueError(f"label class {max_cls} exceeds dataset class count {nc}, "
+                             f"possible class labels are 0-{nc - 1}")
+        _, keep = np.unique(labels, axis=0, return_index=True)
+        if len(keep) < len(labels):
+            msg = f"{len(labels) - len(keep)} duplicate labels removed"
+            labels = labels[np.sort(keep)]
+    return labels[:, :1], labels[:, 1:], msg
+
+
+def letterbox_image(path, imgsz):
+    """
+    Decode and resize so the long side is imgsz, keeping aspect ratio.
+    The image is placed top-left in an imgsz x imgsz slot so that normalized
+    labels stay valid for the unpadded region.
+    """
+    im = cv2.imread(path)  # BGR, same as ultralytics
+    if im is None:
+        raise FileNotFoundError(f"Image not found or unreadable: {path}")
+    h0, w0 = im.shape[:2]
+    r = imgsz / max(h0, w0)
+    if r != 1:
+        w, h = min(imgsz, round(w0 * r)), min(imgsz, round(h0 * r))
+        im = cv2.resize(im, (w, h), interpolation=cv2.INTER_LINEAR)
+    slot = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    slot[:im.shape[0], :im.shape[1]] = im
+    return slot, (h0, w0), im.shape[:2]
+
+
+class CachedYOLODataset(YOLODataset):
+    """YOLODataset that reads images and labels from a prepare_cache.py cache"""
+
+    def __init__(self, *args, images_path=None, meta_path=None, **kwargs):
+        self.images_path = images_path
+        with np.load(meta_path, allow_pickle=False) as meta:
+            self.meta = {k: meta[k] for k in meta.files}
+        self.cache_index = {f: i for i, f in enumerate(self.meta["files"])}
+        self._mmap = None
+        super().__init__(*args, **kwargs)
+
+    def __getstate__(self):
+        # Each dataloader worker maps the file itself rather than pickling pixels
+        state = self.__dict__.copy()
+        state["_mmap"] = None
+        return state
+
+    def _slot(self, im_file):
+        slot = self.cache_index.get(cache_key(im_file))
+        if slot is None:
+            raise KeyError(f"{im_file} is not in the dataset cache, re-run prepare_cache.py")
+        return slot
+
+    def get_labels(self):
+        offsets = self.meta["label_offsets"]
+        labels = []
+        for im_file in self.im_files:
+            i = self._slot(im_file)
+            if not self.meta["valid"][i]:
+                # Label file failed the checks in prepare_cache.py
+                continue
+            a, b = offsets[i], offsets[i + 1]
+            labels.append({
+                "im_file": im_file,
+                "shape": tuple(int(x) for x in self.meta["orig_shapes"][i]),
+                "cls": self.meta["cls"][a:b],
+                "bboxes": self.meta["bboxes"][a:b],
+                "segments": [],
+                "keypoints": None,
+                "normalized": True,
+                "bbox_format": "xywh",
+            })
+        self.im_files = [lb["im_file"] for lb in labels]
+        return labels
+
+    def load_image(self, i, rect_mode=True):
+        if self.ims[i] is not None:
+            return self.ims[i], self.im_hw0[i], self.im_hw[i]
+
+        if self._mmap is None:
+            self._mmap = np.load(self.images_path, mmap_mode="r")
+        slot = self._slot(self.im_files[i])
+        h, w = (int(x) for x in self.meta["shapes"][slot])
+        h0, w0 = (int(x) for x in self.meta["orig_shapes"][slot])
+        im = np.ascontiguousarray(self._mmap[slot, :h, :w])
+
+        if self.augment:
+            # Keep the mosaic buffer behaviour of BaseDataset.load_image
+            self.ims[i], self.im_hw0[i], self.im_hw[i] = im, (h0, w0), (h, w)
+            self.buffer.append(i)
+            if 1 < len(self.buffer) >= self.max_buffer_length:
+                j = self.buffer.pop(0)
+                self.ims[j], self.im_hw0[j], self.im_hw[j] = None, None, None
+        return im, (h0, w0), (h, w)
+
+
+def build_cached_dataset(cfg, img_path, batch, data, mode, stride, images_path, meta_path):
+    """Mirror of ultralytics build_yolo_dataset using the cached dataset"""
+    return CachedYOLODataset(
+        img_path=img_path,
+        imgsz=cfg.imgsz,
+        batch_size=batch,
+        augment=mode == "train",
+        hyp=cfg,
+        rect=cfg.rect or mode == "val",
+        cache=None,
+        single_cls=cfg.single_cls or False,
+        stride=int(stride),
+        pad=0.0 if mode == "train" else 0.5,
+        prefix=colorstr(f"{mode} (cached): "),
+        task=cfg.task,
+        classes=cfg.classes,
+        data=data,
+        fraction=cfg.fraction if mode == "train" else 1.0,
+        images_path=images_path,
+        meta_path=meta_path,
+    )
+
+
+class CachedDetectionTrainer(DetectionTrainer):
+    """DetectionTrainer that trains from the memory-mapped cache when present"""
+
+    cache_dir = "dataset_cache"
+
+    def build_dataset(self, img_path, mode="train", batch=None):
+        images_path, meta_path = cache_paths(self.cache_dir, mode, self.args.imgsz)
+        if mode != "train" or not cache_is_current(img_path, images_path, meta_path):
+            if mode == "train":
+                print("[CACHE] Cache missing or out of date, decoding JPEGs (re-run prepare_cache.py)")
+            return super().build_dataset(img_path, mode, batch)
+        gs = max(int(self.model.stride.max() if hasattr(self.model, "stride") else 32), 32)
+        print(f"[CACHE] Training from {images_path}")
+        return build_cached_dataset(self.args, img_path, batch, self.data, mode, gs, images_path, meta_path)
+
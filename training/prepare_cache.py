@@ -0,0 +1,157 @@
+"""
+Decode and letterbox the training images once into a memory-mapped cache
+Run before train.py; pass --benchmark to time one epoch of data loading with
+the JPEG loader against the cached loader
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from ultralytics.cfg import get_cfg
+from ultralytics.data import YOLODataset, build_dataloader
+from ultralytics.data.utils import check_det_dataset, img2label_paths
+from ultralytics.utils import DEFAULT_CFG
+
+from cached_dataset import (
+    build_cached_dataset,
+    cache_is_current,
+    cache_paths,
+    dataset_fingerprint,
+    letterbox_image,
+    list_images,
+    read_label,
+)
+
+
+def build_cache(img_dir, images_path, meta_path, imgsz, threads, nc):
+    files = list_images(img_dir)
+    if not files:
+        raise FileNotFoundError(f"No images found in {img_dir}")
+    print(f'\n📂 {len(files)} images in {img_dir}')
+    # Fingerprint before decoding so changes made during the build mark the cache stale
+    fingerprint = dataset_fingerprint(files)
+
+    # Metadata is written last, so removing it first marks a half-built cache as invalid
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    # Check labels first; images with a corrupt label file are left out of training
+    cls, bboxes, offsets = [], [], [0]
+    valid = np.ones(len(files), dtype=bool)
+    for i, label_path in enumerate(img2label_paths(files)):
+        try:
+            c, b, msg = read_label(label_path, nc)
+        except ValueError as e:
+            valid[i] = False
+            c, b = np.zeros((0, 1), np.float32), np.zeros((0, 4), np.float32)
+            print(f'   ⚠️  {files[i]}: ignoring corrupt image/label: {e}')
+        else:
+            if msg:
+                print(f'   ⚠️  {files[i]}: {msg}')
+        cls.append(c)
+        bboxes.append(b)
+        offsets.append(offsets[-1] + len(c))
+    if not valid.all():
+        print(f'   ⚠️  {int((~valid).sum())} corrupt label files, fix them and re-run to include those images')
+
+    images = np.lib.format.open_memmap(images_path, mode="w+", dtype=np.uint8,
+                                       shape=(len(files), imgsz, imgsz, 3))
+    orig_shapes = np.zeros((len(files), 2), dtype=np.int32)
+    shapes = np.zeros((len(files), 2), dtype=np.int32)
+
+    def work(i):
+        if valid[i]:
+            images[i], orig_shapes[i], shapes[i] = letterbox_image(files[i], imgsz)
+
+    start = time.perf_counter()
+    # cv2 releases the GIL while decoding/resizing, so threads scale here
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for n, _ in enumerate(pool.map(work, range(len(files))), start=1):
+            if n % 500 == 0 or n == len(files):
+                print(f'   {n}/{len(files)} images cached')
+    images.flush()
+    del images
+
+    np.savez(
+        meta_path,
+        **fingerprint,
+        imgsz=np.array(imgsz),
+        orig_shapes=orig_shapes,
+        shapes=shapes,
+        valid=valid,
+        label_offsets=np.array(offsets, dtype=np.int64),
+        cls=np.concatenate(cls) if cls else np.zeros((0, 1), np.float32),
+        bboxes=np.concatenate(bboxes) if bboxes else np.zeros((0, 4), np.float32),
+    )
+    size_gb = os.path.getsize(images_path) / 1024 ** 3
+    print(f'   ✅ Saved: {images_path} ({size_gb:.2f} GB) in {time.perf_counter() - start:.0f}s')
+    print(f'   ✅ Saved: {meta_path} ({offsets[-1]} labels)')
+
+
+def time_epoch(dataset, batch, workers):
+    loader = build_dataloader(dataset, batch, workers, shuffle=True)
+    start = time.perf_counter()
+    for _ in loader:
+        pass
+    return time.perf_counter() - start
+
+
+def benchmark(data, img_dir, images_path, meta_path, imgsz, batch, workers):
+    cfg = get_cfg(DEFAULT_CFG, {"imgsz": imgsz, "task": "detect"})
+
+    jpeg = YOLODataset(img_path=img_dir, imgsz=imgsz, batch_size=batch, augment=True,
+                       hyp=cfg, rect=False, stride=32, task="detect", data=data)
+    cached = build_cached_dataset(cfg, img_dir, batch, data, "train", 32, images_path, meta_path)
+
+    print('\n' + '='*70)
+    print('DATA LOADING BENCHMARK (one epoch, train augmentation)')
+    print('='*70)
+    runs = [
+        ('JPEG loader, workers=0 (current)', jpeg, 0),
+        (f'JPEG loader, workers={workers}', jpeg, workers),
+        (f'Cached loader, workers={workers}', cached, workers),
+    ]
+    baseline = None
+    for name, dataset, n in runs:
+        seconds = time_epoch(dataset, batch, n)
+        baseline = baseline or seconds
+        print(f'{name:38} - {seconds:7.1f}s  ({baseline / seconds:.1f}x)')
+    print('='*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--data', default='data.yaml')
+    parser.add_argument('--split', default='train')
+    parser.add_argument('--imgsz', type=int, default=640)
+    parser.add_argument('--cache-dir', default='dataset_cache')
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--benchmark', action='store_true')
+    parser.add_argument('--batch', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=min(8, os.cpu_count() or 1))
+    args = parser.parse_args()
+
+    print('='*70)
+    print('DATASET CACHE PREPARATION')
+    print('='*70)
+
+    data = check_det_dataset(args.data)
+    img_dir = data[args.split]
+    os.makedirs(args.cache_dir, exist_ok=True)
+    images_path, meta_path = cache_paths(args.cache_dir, args.split, args.imgsz)
+
+    if cache_is_current(img_dir, images_path, meta_path):
+        print(f'\n♻️  Cache is up to date: {images_path}')
+    else:
+        if os.path.exists(meta_path):
+            print('\n🔄 Images or labels changed since the cache was built, rebuilding')
+        build_cache(img_dir, images_path, meta_path, args.imgsz, args.threads, data['nc'])
+
+    if args.benchmark:
+        benchmark(data, img_dir, images_path, meta_path, args.imgsz, args.batch, args.workers)
+
+
+if __name__ == "__main__":
+    main()
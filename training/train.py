@@ -1,6 +1,13 @@
 from ultralytics import YOLO
+from ultralytics.data.utils import check_det_dataset
+import os
 import torch
 
+from cached_dataset import CachedDetectionTrainer, cache_is_current, cache_paths
+
+IMGSZ = 640
+CACHE_DIR = "dataset_cache"
+
 
 def main():
     # Check GPU availability
@@ -11,20 +18,34 @@ def main():
         print("No GPU detected. Training will use CPU.")
         device = "cpu"
 
+    # Use the memory-mapped cache from prepare_cache.py when it matches the dataset
+    images_path, meta_path = cache_paths(CACHE_DIR, "train", IMGSZ)
+    train_dir = check_det_dataset("data.yaml")["train"]
+    if cache_is_current(train_dir, images_path, meta_path):
+        print("Using dataset cache:", images_path)
+        CachedDetectionTrainer.cache_dir = CACHE_DIR
+        trainer = CachedDetectionTrainer
+        workers = min(8, os.cpu_count() or 1)
+    else:
+        print("No up-to-date dataset cache (run prepare_cache.py). Decoding JPEGs each epoch.")
+        trainer = None
+        workers = 0
+
     # Load YOLOv8 model
     model = YOLO("yolov8n.pt")
 
     # Train with class balancing for better accuracy
     model.train(
+        trainer=trainer,
         data="data.yaml",
         epochs=50,                    # More epochs for better learning
-        imgsz=640,
+        imgsz=IMGSZ,
         batch=-1,                     # Auto-detect best batch size
         device=device,
         project="runs/detect",
         name="waste_train_balanced",
         verbose=True,
-        workers=0,
+        workers=workers,
         patience=15,                  # Early stopping
         save=True,
         plots=True,